@@ -0,0 +1,55 @@
+"""
+JSON helpers backed by orjson, falling back to the standard library.
+Both paths read bytes or str and write UTF-8 bytes, so callers can use
+binary file modes either way.
+"""
+
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+    import json
+
+try:
+    import ijson
+except ImportError:  # Fall back to loading whole files
+    ijson = None
+
+
+def loads(data):
+    """Parse a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent=False, default=None):
+    """Serialize obj to UTF-8 JSON bytes, indented two spaces if requested."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=None if indent else (',', ':'),
+        default=default,
+        ensure_ascii=False
+    ).encode('utf-8')
+
+
+def iter_items(path):
+    """
+    Yield the elements of a file holding a top-level JSON array. Streams
+    them with ijson when installed so only one element is in memory at a
+    time; otherwise loads the whole file.
+    """
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    else:
+        yield from loads(Path(path).read_bytes())
@@ -4,23 +4,81 @@ AI-powered note analyzer - Test single note analysis.
 Categorizes content into: tasks, ideas, projects, links, and notes.
 """
 
-import json
+import html
 import re
+from collections import defaultdict
 from pathlib import Path
+from urllib.parse import urlsplit
+
+import _json_fast
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:  # Fall back to regex tag stripping
+    HTMLParser = None
+
+
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style)[^>]*>.*?</\1>', re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+# Blank-line runs collapse to a paragraph break, space runs (including the
+# no-break spaces left by &nbsp;) to a single space.
+_WS_RE = re.compile(r'\n\s*\n|[ \xa0]+')
+
+_TODO_RE = re.compile(r'(?:TODO|TO-DO|To Do|to do|ToDo)[\s:]*([^\n]+)', re.IGNORECASE)
+_CHECKBOX_RE = re.compile(r'[-*]\s*\[\s*\]\s*([^\n]+)')
+_ACTION_VERBS = ('call', 'email', 'send', 'buy', 'create', 'build', 'fix', 'update',
+                 'contact', 'schedule', 'book', 'order', 'cancel', 'transfer', 'decide')
+_ACTION_RE = re.compile(
+    r'^[-*•]?\s*(' + '|'.join(_ACTION_VERBS) + r')\s+([^\n]+)',
+    re.IGNORECASE | re.MULTILINE
+)
+_OBLIGATION_RE = re.compile(r'(?:need to|have to|must|should)\s+([^\n.!?]+)', re.IGNORECASE)
+
+_IDEA_RE = re.compile(r'(?:Idea|IDEA|Concept)[\s:]*([^\n]+)')
+_QUESTION_RE = re.compile(r'([^\n.!?]*\?)')
+_CREATIVE_RE = re.compile(r'(?:what if|imagine|could|might|consider|explore)\s+([^\n.!?]+)', re.IGNORECASE)
+
+_PROJECT_RE = re.compile(r'(?:Project|PROJECT)[\s:]*([^\n]+)')
+_NUMBERED_LIST_RE = re.compile(r'(?:\d+[\.)]\s+[^\n]+\n?)+')
+_BUSINESS_RE = re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\b')
+
+_SENT_SPLIT_RE = re.compile(r'[.!?]\s+')
+
+# Link categories keyed by domain; subdomains match their parent domain
+_LINK_DOMAINS = {
+    'youtube.com': 'youtube',
+    'youtu.be': 'youtube',
+    'instagram.com': 'social_media',
+    'facebook.com': 'social_media',
+    'twitter.com': 'social_media',
+    'tiktok.com': 'social_media',
+    'github.com': 'documentation',
+}
+_DOC_MARKERS = ('docs.', 'documentation')
+
+
+def _collapse_ws(match):
+    return '\n\n' if '\n' in match.group() else ' '
 
 
 def clean_html_to_text(html_content):
     """Convert HTML to plain text for analysis."""
-    # Remove script and style elements
-    text = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html_content, flags=re.DOTALL)
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '\n', html_content)
-    # Decode HTML entities
-    text = text.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
-    text = text.replace('&quot;', '"').replace('&#39;', "'").replace('&nbsp;', ' ')
+    if HTMLParser is not None:
+        tree = HTMLParser(html_content)
+        # Remove script and style elements
+        for tag in tree.css('script,style'):
+            tag.decompose()
+        # Text nodes come back with entities already decoded
+        text = tree.text(separator='\n')
+    else:
+        # Remove script and style elements
+        text = _SCRIPT_STYLE_RE.sub('', html_content)
+        # Remove HTML tags
+        text = _TAG_RE.sub('\n', text)
+        # Decode HTML entities
+        text = html.unescape(text)
     # Clean up whitespace
-    text = re.sub(r'\n\s*\n', '\n\n', text)
-    text = re.sub(r' +', ' ', text)
+    text = _WS_RE.sub(_collapse_ws, text)
     return text.strip()
 
 
@@ -29,26 +87,19 @@ def analyze_tasks(text):
     tasks = []
 
     # Pattern 1: TODO, TO-DO, etc.
-    todo_pattern = r'(?:TODO|TO-DO|To Do|to do|ToDo)[\s:]*([^\n]+)'
-    matches = re.findall(todo_pattern, text, re.IGNORECASE)
+    matches = _TODO_RE.findall(text)
     tasks.extend([m.strip() for m in matches if m.strip()])
 
     # Pattern 2: Checkbox items (- [ ], * [ ])
-    checkbox_pattern = r'[-*]\s*\[\s*\]\s*([^\n]+)'
-    matches = re.findall(checkbox_pattern, text)
+    matches = _CHECKBOX_RE.findall(text)
     tasks.extend([m.strip() for m in matches if m.strip()])
 
     # Pattern 3: Action verbs at start of lines
-    action_verbs = ['call', 'email', 'send', 'buy', 'create', 'build', 'fix', 'update',
-                    'contact', 'schedule', 'book', 'order', 'cancel', 'transfer', 'decide']
-    for verb in action_verbs:
-        pattern = rf'^[-*•]?\s*{verb}\s+([^\n]+)'
-        matches = re.findall(pattern, text, re.IGNORECASE | re.MULTILINE)
-        tasks.extend([f"{verb.capitalize()} {m.strip()}" for m in matches if m.strip()])
+    matches = _ACTION_RE.findall(text)
+    tasks.extend([f"{verb.capitalize()} {m.strip()}" for verb, m in matches if m.strip()])
 
     # Pattern 4: Lines with "need to", "have to", "must"
-    obligation_pattern = r'(?:need to|have to|must|should)\s+([^\n.!?]+)'
-    matches = re.findall(obligation_pattern, text, re.IGNORECASE)
+    matches = _OBLIGATION_RE.findall(text)
     tasks.extend([m.strip() for m in matches if m.strip() and len(m.strip()) > 10])
 
     return list(set(tasks))[:20]  # Limit to 20 unique tasks
@@ -59,18 +110,15 @@ def analyze_ideas(text):
     ideas = []
 
     # Pattern 1: "Idea:" prefix
-    idea_pattern = r'(?:Idea|IDEA|Concept)[\s:]*([^\n]+)'
-    matches = re.findall(idea_pattern, text)
+    matches = _IDEA_RE.findall(text)
     ideas.extend([m.strip() for m in matches if m.strip()])
 
     # Pattern 2: Question marks (often indicate exploratory ideas)
-    question_pattern = r'([^\n.!?]*\?)'
-    matches = re.findall(question_pattern, text)
+    matches = _QUESTION_RE.findall(text)
     ideas.extend([m.strip() for m in matches if len(m.strip()) > 20])
 
     # Pattern 3: Creative/planning language
-    creative_pattern = r'(?:what if|imagine|could|might|consider|explore)\s+([^\n.!?]+)'
-    matches = re.findall(creative_pattern, text, re.IGNORECASE)
+    matches = _CREATIVE_RE.findall(text)
     ideas.extend([m.strip() for m in matches if m.strip() and len(m.strip()) > 10])
 
     return list(set(ideas))[:15]  # Limit to 15 unique ideas
@@ -81,27 +129,48 @@ def analyze_projects(text):
     projects = []
 
     # Pattern 1: "Project:" prefix
-    project_pattern = r'(?:Project|PROJECT)[\s:]*([^\n]+)'
-    matches = re.findall(project_pattern, text)
+    matches = _PROJECT_RE.findall(text)
     projects.extend([m.strip() for m in matches if m.strip()])
 
     # Pattern 2: Multi-step initiatives (numbered lists)
-    numbered_list = r'(?:\d+[\.)]\s+[^\n]+\n?)+'
-    matches = re.findall(numbered_list, text)
+    matches = _NUMBERED_LIST_RE.findall(text)
     if len(matches) > 2:  # If there are multiple numbered lists
         projects.append(f"Multi-step plan found ({len(matches)} items)")
 
     # Pattern 3: Business/product names (capitalized multi-word phrases)
-    business_pattern = r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\b'
-    matches = re.findall(business_pattern, text)
-    # Filter for likely project names (appears multiple times)
-    from collections import Counter
-    counted = Counter(matches)
-    projects.extend([name for name, count in counted.items() if count >= 2][:5])
+    # Keep likely project names (appears multiple times), taking each on its
+    # second occurrence and stopping the scan once five are found
+    counts = defaultdict(int)
+    repeated = []
+    for match in _BUSINESS_RE.finditer(text):
+        name = match.group(1)
+        counts[name] += 1
+        if counts[name] == 2:
+            repeated.append(name)
+            if len(repeated) == 5:
+                break
+    projects.extend(repeated)
 
     return list(set(projects))[:10]  # Limit to 10 unique projects
 
 
+def _link_category(link, domains):
+    """Look up a link's category by its host or any parent domain of it."""
+    try:
+        host = urlsplit(link).hostname or ''
+    except ValueError:  # Malformed URL
+        return None
+
+    # www.m.youtube.com -> m.youtube.com -> youtube.com -> com
+    while host:
+        category = domains.get(host)
+        if category:
+            return category
+        host = host.partition('.')[2]
+
+    return None
+
+
 def categorize_links(links):
     """Categorize links by type."""
     categorized = {
@@ -112,29 +181,29 @@ def categorize_links(links):
     }
 
     for link in links:
-        if 'youtube.com' in link or 'youtu.be' in link:
-            categorized['youtube'].append(link)
-        elif any(site in link for site in ['instagram.com', 'facebook.com', 'twitter.com', 'tiktok.com']):
-            categorized['social_media'].append(link)
-        elif any(site in link for site in ['github.com', 'docs.', 'documentation']):
-            categorized['documentation'].append(link)
-        else:
-            categorized['other'].append(link)
+        category = _link_category(link, _LINK_DOMAINS)
+        if category is None:
+            category = 'documentation' if any(m in link for m in _DOC_MARKERS) else 'other'
+        categorized[category].append(link)
 
     return categorized
 
 
 def generate_summary(text, max_length=200):
     """Generate a brief summary of the note content."""
-    # Get first meaningful sentences
-    sentences = re.split(r'[.!?]\s+', text)
-    summary = ""
-    for sentence in sentences:
-        if len(sentence.strip()) > 20:  # Skip very short sentences
-            if len(summary + sentence) < max_length:
-                summary += sentence + ". "
-            else:
-                break
+    # Get first meaningful sentences, tracking the length of the joined
+    # summary instead of rebuilding the string on every sentence
+    parts = []
+    length = 0
+    for sentence in _SENT_SPLIT_RE.split(text):
+        if len(sentence.strip()) <= 20:  # Skip very short sentences
+            continue
+        if length + len(sentence) >= max_length:
+            break
+        parts.append(sentence)
+        length += len(sentence) + 2
+
+    summary = '. '.join(parts) + '.' if parts else ''
     return summary.strip() or text[:max_length] + "..."
 
 
@@ -152,8 +221,8 @@ def analyze_note(note_file):
     print("=" * 60)
 
     # Load note
-    with open(note_file, 'r') as f:
-        note = json.load(f)
+    with open(note_file, 'rb') as f:
+        note = _json_fast.loads(f.read())
 
     # Extract plain text
     plain_text = clean_html_to_text(note['content'])
@@ -225,8 +294,8 @@ def analyze_note(note_file):
 
     # Save analyzed note
     output_file = Path(note_file).parent / f"analyzed_{Path(note_file).name}"
-    with open(output_file, 'w') as f:
-        json.dump(note, f, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(_json_fast.dumps(note, indent=True))
 
     print(f"\n✅ Analysis saved to: {output_file}")
 
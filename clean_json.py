@@ -1,21 +1,26 @@
 #!/usr/bin/env python3
 """Clean JSON output from AppleScript by removing problematic control characters."""
 import sys
-import re
+
+# ASCII 0-31 except \t, \n and \r, each mapped to a space
+_CTRL_TABLE = str.maketrans({
+    c: ' ' for c in map(chr, [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20)])
+})
+
+# Characters read from stdin per chunk
+CHUNK_SIZE = 1 << 20
 
 def clean_control_chars(text):
     """Remove or replace control characters that break JSON parsing."""
     # Remove control characters except \n, \r, \t which are already escaped
     # This handles ASCII 0-31 except the ones we want to keep
-    cleaned = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F]', ' ', text)
+    cleaned = text.translate(_CTRL_TABLE)
     return cleaned
 
 if __name__ == "__main__":
-    # Read from stdin
-    input_text = sys.stdin.read()
-
-    # Clean control characters
-    cleaned = clean_control_chars(input_text)
-
-    # Write to stdout
-    sys.stdout.write(cleaned)
+    # The AppleScript export is a single line, so stream fixed-size chunks
+    # rather than lines to keep memory flat regardless of export size.
+    # Cleaning is per character, so chunk boundaries need no special care.
+    write = sys.stdout.write
+    for chunk in iter(lambda: sys.stdin.read(CHUNK_SIZE), ''):
+        write(clean_control_chars(chunk))
@@ -6,14 +6,74 @@ optimized for timeline queries and database application use.
 """
 
 import sqlite3
-import json
+import calendar
 import os
 import re
 from datetime import datetime
 from pathlib import Path
 from html.parser import HTMLParser
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import field, make_dataclass
+
+import _json_fast
+
+try:
+    import msgspec
+except ImportError:  # Fall back to dict decoding into a dataclass
+    msgspec = None
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # Fall back to the pure-Python html.parser converter
+    lxml_etree = None
+
+# Tags whose end emits a line break, and tags whose text is dropped
+BLOCK_TAGS = frozenset({'p', 'div', 'br', 'li', 'tr'})
+SKIP_TAGS = frozenset({'script', 'style'})
+
+_DOW_RE = re.compile(r'^[A-Za-z]+,\s+')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# <br/> and </br> reach HTMLToText.handle_endtag; a bare <br> never does
+_CLOSED_BR_RE = re.compile(r'<br\s*/|</br', re.IGNORECASE)
+
+# Common macOS date shape, e.g. "Saturday, November 8, 2025 at 9:59:06 PM"
+_MACOS_DATE_RE = re.compile(
+    r'(?:[A-Za-z]+,\s+)?([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4}) at '
+    r'(\d{1,2}):(\d{2}):(\d{2})(?:\s+([AaPp][Mm]))?'
+)
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+
+# strptime formats tried by parse_macos_date, in order
+DATE_FORMATS = (
+    '%B %d, %Y',  # November 8, 2025
+    '%b %d, %Y',   # Nov 8, 2025
+)
+TIME_FORMATS = (
+    '%H:%M:%S',      # 24-hour
+    '%I:%M:%S %p',   # 12-hour with AM/PM
+)
+FALLBACK_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+)
+
+# lxml parsers hold a lock for the whole parse, so each worker thread gets
+# its own instead of queueing on a shared one
+_lxml_local = threading.local()
+
+
+def _lxml_parser():
+    """Return this thread's lxml HTML parser, creating it on first use"""
+    parser = getattr(_lxml_local, 'parser', None)
+    if parser is None:
+        parser = _lxml_local.parser = lxml_etree.HTMLParser(remove_comments=True, remove_pis=True)
+    return parser
 
 
 class HTMLToText(HTMLParser):
@@ -21,14 +81,14 @@ class HTMLToText(HTMLParser):
     def __init__(self):
         super().__init__()
         self.text_parts = []
-        self.skip_tags = {'script', 'style'}
+        self.skip_tags = SKIP_TAGS
         self.current_tag = None
 
     def handle_starttag(self, tag, attrs):
         self.current_tag = tag
 
     def handle_endtag(self, tag):
-        if tag in ['p', 'div', 'br', 'li', 'tr']:
+        if tag in BLOCK_TAGS:
             self.text_parts.append('\n')
         self.current_tag = None
 
@@ -42,11 +102,53 @@ class HTMLToText(HTMLParser):
         return ' '.join(self.text_parts)
 
 
+def lxml_html_to_text(html_content: str) -> str:
+    """
+    Convert HTML content to plain text with lxml's C parser.
+    Produces the same layout as HTMLToText: stripped text runs joined by
+    spaces, with a newline after each block-level element. A <br> gets no
+    newline, matching html.parser, which never ends a bare <br>; lxml cannot
+    tell <br> from <br/>, so html_to_text sends the latter to HTMLToText.
+    """
+    root = lxml_etree.fromstring(html_content, _lxml_parser())
+    if root is None:
+        return ""
+
+    text_parts = []
+    for event, element in lxml_etree.iterwalk(root, events=('start', 'end')):
+        if event == 'start':
+            text = element.text
+            if text and element.tag not in SKIP_TAGS:
+                text = text.strip()
+                if text:
+                    text_parts.append(text)
+        else:
+            if element.tag in BLOCK_TAGS and element.tag != 'br':
+                text_parts.append('\n')
+            text = element.tail
+            if text:
+                text = text.strip()
+                if text:
+                    text_parts.append(text)
+
+    return ' '.join(text_parts)
+
+
 def html_to_text(html_content: str) -> str:
     """Convert HTML content to plain text"""
     if not html_content:
         return ""
 
+    # Plain text with no tags or entities converts to itself, stripped
+    if '<' not in html_content and '&' not in html_content:
+        return html_content.strip()
+
+    if lxml_etree is not None and not _CLOSED_BR_RE.search(html_content):
+        try:
+            return lxml_html_to_text(html_content)
+        except Exception:
+            pass  # Retry with the more literal html.parser converter
+
     parser = HTMLToText()
     try:
         parser.feed(html_content)
@@ -54,7 +156,60 @@ def html_to_text(html_content: str) -> str:
     except Exception as e:
         print(f"Warning: HTML parsing error: {e}")
         # Fallback: simple tag stripping
-        return re.sub(r'<[^>]+>', ' ', html_content).strip()
+        return _TAG_RE.sub(' ', html_content).strip()
+
+
+def macos_date_fields(date_str: str) -> Optional[Tuple[int, int, int, int, int, int]]:
+    """
+    Match the common macOS date shape with one regex and integer arithmetic.
+    Returns validated (year, month, day, hour, minute, second), or None for
+    anything it does not fully validate so the caller can fall back to strptime.
+    """
+    match = _MACOS_DATE_RE.fullmatch(date_str)
+    if not match:
+        return None
+
+    month_name, day, year, hour, minute, second, meridiem = match.groups()
+    month = MONTHS.get(month_name.lower())
+    if month is None:
+        return None
+
+    hour = int(hour)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour %= 12
+        if meridiem.upper() == 'PM':
+            hour += 12
+
+    year, day, minute, second = int(year), int(day), int(minute), int(second)
+    if not (year >= 1 and 1 <= day <= calendar.monthrange(year, month)[1]
+            and hour <= 23 and minute <= 59 and second <= 59):
+        return None
+
+    return year, month, day, hour, minute, second
+
+
+def parse_macos_date_fast(date_str: str) -> Optional[datetime]:
+    """Parse the common macOS date shape without strptime, or return None"""
+    fields = macos_date_fields(date_str)
+    return datetime(*fields) if fields else None
+
+
+def parse_macos_date_iso(date_str: str) -> Optional[str]:
+    """
+    Parse a macOS date straight to the 'YYYY-MM-DD HH:MM:SS' text SQLite
+    stores, skipping the datetime object and adapter for the common shape
+    """
+    if not date_str:
+        return None
+
+    fields = macos_date_fields(date_str)
+    if fields:
+        return '%04d-%02d-%02d %02d:%02d:%02d' % fields
+
+    parsed = parse_macos_date(date_str)
+    return parsed.isoformat(' ') if parsed else None
 
 
 def parse_macos_date(date_str: str) -> Optional[datetime]:
@@ -65,22 +220,21 @@ def parse_macos_date(date_str: str) -> Optional[datetime]:
     if not date_str:
         return None
 
+    parsed = parse_macos_date_fast(date_str)
+    if parsed is not None:
+        return parsed
+
     try:
         # Remove day of week if present
-        date_str_clean = re.sub(r'^[A-Za-z]+,\s+', '', date_str)
+        date_str_clean = _DOW_RE.sub('', date_str)
 
         # Try parsing with "at" separator
         if ' at ' in date_str_clean:
             date_part, time_part = date_str_clean.split(' at ')
 
             # Parse date part (e.g., "November 8, 2025")
-            date_formats = [
-                '%B %d, %Y',  # November 8, 2025
-                '%b %d, %Y',   # Nov 8, 2025
-            ]
-
             parsed_date = None
-            for fmt in date_formats:
+            for fmt in DATE_FORMATS:
                 try:
                     parsed_date = datetime.strptime(date_part, fmt)
                     break
@@ -91,12 +245,7 @@ def parse_macos_date(date_str: str) -> Optional[datetime]:
                 return None
 
             # Parse time part (e.g., "21:59:06" or "9:59:06 PM")
-            time_formats = [
-                '%H:%M:%S',      # 24-hour
-                '%I:%M:%S %p',   # 12-hour with AM/PM
-            ]
-
-            for fmt in time_formats:
+            for fmt in TIME_FORMATS:
                 try:
                     time_obj = datetime.strptime(time_part, fmt)
                     return datetime.combine(
@@ -107,12 +256,7 @@ def parse_macos_date(date_str: str) -> Optional[datetime]:
                     continue
 
         # Fallback: try standard formats
-        fallback_formats = [
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%d',
-        ]
-
-        for fmt in fallback_formats:
+        for fmt in FALLBACK_FORMATS:
             try:
                 return datetime.strptime(date_str, fmt)
             except ValueError:
@@ -125,6 +269,442 @@ def parse_macos_date(date_str: str) -> Optional[datetime]:
         return None
 
 
+# Notes buffered by NotesDatabase.import_note before they are inserted
+BATCH_SIZE = 5000
+
+# Note files read ahead of the one being queued; bounds the built rows held
+# while the writer is busy flushing
+MAX_PENDING = 256
+
+# Error messages kept in the import stats; any beyond this are only counted
+MAX_ERRORS = 1000
+
+# Tables filled per note, in insert order, with the import stat each counts
+ROW_STATS = {
+    'notes': 'notes_imported',
+    'extracted_links': 'links_imported',
+    'extracted_images': 'images_imported',
+    'note_categories': 'categories_imported',
+    'analysis': None,
+    'extracted_tasks': 'tasks_imported',
+    'extracted_ideas': 'ideas_imported',
+    'extracted_projects': 'projects_imported',
+}
+
+# Top-level note fields read by the import, with the default used when a
+# field is absent. Nested extracted_data and analysis stay plain dicts.
+NOTE_FIELDS = (
+    ('note_id', None),
+    ('original_index', 0),
+    ('title', 'Untitled'),
+    ('content', ''),
+    ('content_cleaned', None),
+    ('folder', 'Notes'),
+    ('account', 'Unknown'),
+    ('id', ''),
+    ('created', ''),
+    ('modified', ''),
+    ('status', 'pending'),
+    ('processed', False),
+    ('primary_category', None),
+    ('categories', ()),
+    ('extracted_data', None),
+    ('analysis', None),
+)
+
+# Typed note record: a msgspec Struct decoded straight from JSON bytes when
+# msgspec is installed, otherwise a dataclass built from the parsed dict.
+# Fields are untyped so any value a note file holds is passed through as is.
+if msgspec is not None:
+    NoteRecord = msgspec.defstruct('NoteRecord', [(name, Any, default) for name, default in NOTE_FIELDS])
+    _note_decoder = msgspec.json.Decoder(NoteRecord)
+else:
+    NoteRecord = make_dataclass('NoteRecord', [(name, Any, field(default=default)) for name, default in NOTE_FIELDS])
+
+
+def note_from_dict(note_data: Dict) -> NoteRecord:
+    """Build a NoteRecord from a parsed note dict, ignoring unknown keys"""
+    if not isinstance(note_data, dict):
+        raise TypeError(f"expected a JSON object, got {type(note_data).__name__}")
+    return NoteRecord(**{name: note_data[name] for name, _ in NOTE_FIELDS if name in note_data})
+
+
+def decode_note(data: bytes) -> NoteRecord:
+    """Decode a note file's bytes into a NoteRecord"""
+    if msgspec is not None:
+        return _note_decoder.decode(data)
+    return note_from_dict(_json_fast.loads(data))
+
+
+# Integer range sqlite3 can bind; wider ints raise OverflowError on insert
+SQLITE_INT_MIN = -2 ** 63
+SQLITE_INT_MAX = 2 ** 63 - 1
+
+
+def is_bindable(value: Any) -> bool:
+    """True if sqlite3 can bind value as a query parameter"""
+    if isinstance(value, int):
+        return SQLITE_INT_MIN <= value <= SQLITE_INT_MAX
+    return value is None or isinstance(value, (str, float, bytes))
+
+
+# Analysis list sections: (analysis key, table, dict text key, error label)
+ITEM_SECTIONS = (
+    ('tasks', 'extracted_tasks', 'text', 'Task'),
+    ('ideas', 'extracted_ideas', 'text', 'Idea'),
+    ('projects', 'extracted_projects', 'name', 'Project'),
+)
+
+
+def build_note_rows(note: NoteRecord, errors: List[str]) -> Optional[Dict[str, List[Tuple]]]:
+    """
+    Build the insert parameters for a note, keyed by table name.
+    Problems are appended to errors; None means the note is skipped.
+    Child rows that cannot be inserted are reported and left out, so one
+    bad link, image or item never fails its parent note.
+    """
+    try:
+        note_id = note.note_id
+        if not note_id:
+            errors.append("Missing note_id in note data")
+            return None
+
+        rows = {table: [] for table in ROW_STATS}
+
+        # Parse dates
+        created_datetime = parse_macos_date_iso(note.created)
+        modified_datetime = parse_macos_date_iso(note.modified)
+
+        # Convert HTML to plain text
+        content = note.content
+        plain_text = html_to_text(content)
+
+        # content_cleaned is only stored when it differs from content
+        content_cleaned = note.content_cleaned
+        if content_cleaned == content:
+            content_cleaned = None
+
+        # Core note
+        rows['notes'].append((
+            note_id,
+            note.original_index,
+            note.title,
+            content,
+            content_cleaned,
+            plain_text,
+            note.folder,
+            note.account,
+            note.id,
+            note.created,
+            created_datetime,
+            note.modified,
+            modified_datetime,
+            note.status,
+            1 if note.processed else 0,
+            note.primary_category,
+            len(plain_text)
+        ))
+
+        # Extracted links, keeping the first occurrence of each URL
+        seen_links = set()
+        extracted_data = note.extracted_data or {}
+        for link in extracted_data.get('links', []):
+            if not isinstance(link, str):
+                errors.append(f"Link import error for {note_id}: unexpected {type(link).__name__} entry")
+            elif link not in seen_links:
+                seen_links.add(link)
+                rows['extracted_links'].append((note_id, link, None))
+
+        # Also check analysis for categorized links
+        analysis = note.analysis or {}
+        links_categorized = analysis.get('links_categorized', {})
+        for link_type, link_list in links_categorized.items():
+            for link in link_list:
+                if not isinstance(link, str):
+                    errors.append(f"Link import error for {note_id}: unexpected {type(link).__name__} entry")
+                elif link not in seen_links:
+                    seen_links.add(link)
+                    rows['extracted_links'].append((note_id, link, link_type))
+
+        # Extracted images, keeping the first occurrence of each filename
+        seen_images = set()
+        images = extracted_data.get('images', [])
+        for idx, image in enumerate(images, 1):
+            if isinstance(image, dict):
+                filename = image.get('filename', '')
+                relative_path = image.get('path', f"images/{filename}")
+                image_format = image.get('format', '')
+                size_bytes = image.get('size', 0)
+            else:
+                # Simple string filename
+                filename = image
+                relative_path = f"images/{filename}"
+                image_format = ''
+                size_bytes = 0
+
+            if not (isinstance(filename, str) and isinstance(relative_path, str)
+                    and is_bindable(image_format) and is_bindable(size_bytes)):
+                errors.append(f"Image import error for {note_id}: unsupported value in entry {idx}")
+            elif filename not in seen_images:
+                seen_images.add(filename)
+                rows['extracted_images'].append(
+                    (note_id, filename, relative_path, image_format, size_bytes, idx)
+                )
+
+        # Categories
+        for category in dict.fromkeys(note.categories):
+            if isinstance(category, str):
+                rows['note_categories'].append((note_id, category))
+            else:
+                errors.append(f"Category import error for {note_id}: unexpected {type(category).__name__} entry")
+
+        # Analysis data if present
+        if analysis:
+            summary = analysis.get('summary', '')
+            plain_text_sample = analysis.get('plain_text', '')
+            if isinstance(plain_text_sample, str):
+                plain_text_sample = plain_text_sample[:1000]
+
+            if not (is_bindable(summary) and is_bindable(plain_text_sample)):
+                errors.append(f"Analysis import error for {note_id}: unsupported summary or plain_text value")
+            elif summary or plain_text_sample:
+                rows['analysis'].append((note_id, summary, plain_text_sample))
+
+            # Tasks, ideas and projects are plain strings or dicts; anything
+            # else is reported and skipped
+            for section, table, key, label in ITEM_SECTIONS:
+                for item in analysis.get(section, []):
+                    if isinstance(item, str):
+                        text = item
+                    elif isinstance(item, dict):
+                        text = item.get(key, '')
+                    else:
+                        errors.append(f"{label} import error for {note_id}: unexpected {type(item).__name__} entry")
+                        continue
+                    if isinstance(text, str):
+                        rows[table].append((note_id, text))
+                    else:
+                        errors.append(f"{label} import error for {note_id}: unexpected {type(text).__name__} {key}")
+
+        return rows
+
+    except Exception as e:
+        errors.append(f"Failed to import note {note_id}: {e}")
+        return None
+
+
+def iter_note_rows(json_files: List[str]):
+    """
+    Run load_note_rows over the files in worker threads and yield the
+    results in file order. At most MAX_PENDING files are in flight, so
+    finished rows never pile up while the caller is busy inserting.
+    """
+    pending = deque()
+    with ThreadPoolExecutor() as pool:
+        for json_file in json_files:
+            pending.append(pool.submit(load_note_rows, json_file))
+            if len(pending) >= MAX_PENDING:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_note_rows(json_file: Path) -> Tuple[Optional[Dict[str, List[Tuple]]], List[str]]:
+    """Read one note file and build its rows; safe to run in worker threads"""
+    errors = []
+    try:
+        with open(json_file, 'rb') as f:
+            note = decode_note(f.read())
+    except Exception as e:
+        errors.append(f"Failed to read {json_file}: {e}")
+        return None, errors
+
+    return build_note_rows(note, errors), errors
+
+
+# Tables, created before the bulk load
+SCHEMA_SQL = """
+-- Core notes table
+CREATE TABLE IF NOT EXISTS notes (
+    note_id TEXT PRIMARY KEY,
+    original_index INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    content_cleaned TEXT,
+    plain_text TEXT,
+    folder TEXT NOT NULL DEFAULT 'Notes',
+    account TEXT NOT NULL,
+    coredata_id TEXT UNIQUE,
+    created_raw TEXT NOT NULL,
+    created_datetime DATETIME,
+    modified_raw TEXT NOT NULL,
+    modified_datetime DATETIME,
+    status TEXT DEFAULT 'pending',
+    processed BOOLEAN DEFAULT 0,
+    primary_category TEXT,
+    content_length INTEGER,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Extracted links table
+CREATE TABLE IF NOT EXISTS extracted_links (
+    link_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    link_type TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
+);
+
+-- Extracted images table
+CREATE TABLE IF NOT EXISTS extracted_images (
+    image_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    relative_path TEXT NOT NULL,
+    image_format TEXT,
+    size_bytes INTEGER,
+    extraction_order INTEGER,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
+);
+
+-- Analysis results table
+CREATE TABLE IF NOT EXISTS analysis (
+    analysis_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_id TEXT NOT NULL UNIQUE,
+    summary TEXT,
+    plain_text_sample TEXT,
+    analyzed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
+);
+
+-- Extracted tasks table
+CREATE TABLE IF NOT EXISTS extracted_tasks (
+    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_id TEXT NOT NULL,
+    task_text TEXT NOT NULL,
+    priority INTEGER,
+    completed BOOLEAN DEFAULT 0,
+    due_date DATE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
+);
+
+-- Extracted ideas table
+CREATE TABLE IF NOT EXISTS extracted_ideas (
+    idea_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_id TEXT NOT NULL,
+    idea_text TEXT NOT NULL,
+    status TEXT DEFAULT 'new',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
+);
+
+-- Extracted projects table
+CREATE TABLE IF NOT EXISTS extracted_projects (
+    project_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_id TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    status TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
+);
+
+-- Categories table
+CREATE TABLE IF NOT EXISTS note_categories (
+    category_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
+);
+
+-- Accounts lookup table
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_name TEXT NOT NULL UNIQUE,
+    note_count INTEGER DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Folders lookup table
+CREATE TABLE IF NOT EXISTS folders (
+    folder_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    folder_name TEXT NOT NULL,
+    account_name TEXT NOT NULL,
+    note_count INTEGER DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(folder_name, account_name)
+);
+"""
+
+# Indexes, built once the notes are loaded
+INDEX_SQL = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_links_unique ON extracted_links(note_id, url);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_images_unique ON extracted_images(note_id, filename);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_categories_unique ON note_categories(note_id, category);
+CREATE INDEX IF NOT EXISTS idx_notes_folder ON notes(folder);
+CREATE INDEX IF NOT EXISTS idx_notes_account ON notes(account);
+CREATE INDEX IF NOT EXISTS idx_notes_status ON notes(status);
+CREATE INDEX IF NOT EXISTS idx_notes_primary_category ON notes(primary_category);
+CREATE INDEX IF NOT EXISTS idx_notes_created_datetime ON notes(created_datetime);
+CREATE INDEX IF NOT EXISTS idx_notes_modified_datetime ON notes(modified_datetime);
+CREATE INDEX IF NOT EXISTS idx_notes_title ON notes(title);
+CREATE INDEX IF NOT EXISTS idx_links_type ON extracted_links(link_type);
+CREATE INDEX IF NOT EXISTS idx_analysis_note_id ON analysis(note_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_note_id ON extracted_tasks(note_id);
+CREATE INDEX IF NOT EXISTS idx_ideas_note_id ON extracted_ideas(note_id);
+CREATE INDEX IF NOT EXISTS idx_projects_note_id ON extracted_projects(note_id);
+"""
+
+# Insert statements per table, in insert order: notes first so child rows
+# satisfy their foreign keys
+INSERT_SQL = {
+    'notes': '''
+        INSERT INTO notes (
+            note_id, original_index, title, content, content_cleaned,
+            plain_text, folder, account, coredata_id,
+            created_raw, created_datetime, modified_raw, modified_datetime,
+            status, processed, primary_category, content_length
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''',
+    'extracted_links': '''
+        INSERT OR IGNORE INTO extracted_links (note_id, url, link_type)
+        VALUES (?, ?, ?)
+    ''',
+    'extracted_images': '''
+        INSERT OR IGNORE INTO extracted_images (
+            note_id, filename, relative_path, image_format,
+            size_bytes, extraction_order
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    ''',
+    'note_categories': '''
+        INSERT OR IGNORE INTO note_categories (note_id, category)
+        VALUES (?, ?)
+    ''',
+    'analysis': '''
+        INSERT OR IGNORE INTO analysis (
+            note_id, summary, plain_text_sample
+        ) VALUES (?, ?, ?)
+    ''',
+    'extracted_tasks': '''
+        INSERT INTO extracted_tasks (note_id, task_text)
+        VALUES (?, ?)
+    ''',
+    'extracted_ideas': '''
+        INSERT INTO extracted_ideas (note_id, idea_text)
+        VALUES (?, ?)
+    ''',
+    'extracted_projects': '''
+        INSERT INTO extracted_projects (note_id, project_name)
+        VALUES (?, ?)
+    ''',
+}
+
+
 class NotesDatabase:
     """Manages SQLite database creation and data import"""
 
@@ -132,6 +712,7 @@ class NotesDatabase:
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self.pending = []  # Row sets of notes queued for the next flush
         self.stats = {
             'notes_imported': 0,
             'links_imported': 0,
@@ -140,376 +721,123 @@ class NotesDatabase:
             'tasks_imported': 0,
             'ideas_imported': 0,
             'projects_imported': 0,
-            'errors': []
+            'errors': [],
+            'errors_dropped': 0
         }
 
     def connect(self):
-        """Connect to database and enable foreign keys"""
-        self.conn = sqlite3.connect(self.db_path)
+        """Connect to database, enable foreign keys and tune for bulk import"""
+        # Room for every insert and query statement in the prepared-statement cache
+        self.conn = sqlite3.connect(self.db_path, cached_statements=256)
+        # page_size only takes effect on a new database, before any table exists
+        self.conn.execute('PRAGMA page_size = 4096')
+        # WAL avoids an fsync per commit; NORMAL sync is safe under WAL and the
+        # import can always be rerun from the JSON files
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute('PRAGMA temp_store = MEMORY')
+        self.conn.execute('PRAGMA cache_size = -65536')  # 64 MB
+        self.conn.execute('PRAGMA mmap_size = 10737418240')
         self.conn.execute('PRAGMA foreign_keys = ON')
         self.cursor = self.conn.cursor()
 
     def create_schema(self):
-        """Create database schema with all tables and indexes"""
+        """
+        Create database schema with all tables.
+        Uniqueness of links, images and categories per note is enforced by
+        indexes built in create_indexes() after the bulk load, and by
+        deduplication in build_note_rows() during it.
+        """
         print("Creating database schema...")
 
-        # Core notes table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notes (
-                note_id TEXT PRIMARY KEY,
-                original_index INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL,
-                content_cleaned TEXT,
-                plain_text TEXT,
-                folder TEXT NOT NULL DEFAULT 'Notes',
-                account TEXT NOT NULL,
-                coredata_id TEXT UNIQUE,
-                created_raw TEXT NOT NULL,
-                created_datetime DATETIME,
-                modified_raw TEXT NOT NULL,
-                modified_datetime DATETIME,
-                status TEXT DEFAULT 'pending',
-                processed BOOLEAN DEFAULT 0,
-                primary_category TEXT,
-                content_length INTEGER,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Extracted links table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS extracted_links (
-                link_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                note_id TEXT NOT NULL,
-                url TEXT NOT NULL,
-                link_type TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE,
-                UNIQUE(note_id, url)
-            )
-        ''')
-
-        # Extracted images table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS extracted_images (
-                image_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                note_id TEXT NOT NULL,
-                filename TEXT NOT NULL,
-                relative_path TEXT NOT NULL,
-                image_format TEXT,
-                size_bytes INTEGER,
-                extraction_order INTEGER,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE,
-                UNIQUE(note_id, filename)
-            )
-        ''')
-
-        # Analysis results table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS analysis (
-                analysis_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                note_id TEXT NOT NULL UNIQUE,
-                summary TEXT,
-                plain_text_sample TEXT,
-                analyzed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Extracted tasks table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS extracted_tasks (
-                task_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                note_id TEXT NOT NULL,
-                task_text TEXT NOT NULL,
-                priority INTEGER,
-                completed BOOLEAN DEFAULT 0,
-                due_date DATE,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Extracted ideas table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS extracted_ideas (
-                idea_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                note_id TEXT NOT NULL,
-                idea_text TEXT NOT NULL,
-                status TEXT DEFAULT 'new',
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Extracted projects table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS extracted_projects (
-                project_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                note_id TEXT NOT NULL,
-                project_name TEXT NOT NULL,
-                status TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Categories table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS note_categories (
-                category_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                note_id TEXT NOT NULL,
-                category TEXT NOT NULL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (note_id) REFERENCES notes(note_id) ON DELETE CASCADE,
-                UNIQUE(note_id, category)
-            )
-        ''')
-
-        # Accounts lookup table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS accounts (
-                account_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                account_name TEXT NOT NULL UNIQUE,
-                note_count INTEGER DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Folders lookup table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS folders (
-                folder_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                folder_name TEXT NOT NULL,
-                account_name TEXT NOT NULL,
-                note_count INTEGER DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(folder_name, account_name)
-            )
-        ''')
-
-        self.conn.commit()
+        self.conn.executescript(SCHEMA_SQL)
         print("✓ Schema created")
 
     def create_indexes(self):
         """Create indexes for optimized queries"""
         print("Creating indexes for timeline queries...")
 
-        indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_notes_folder ON notes(folder)",
-            "CREATE INDEX IF NOT EXISTS idx_notes_account ON notes(account)",
-            "CREATE INDEX IF NOT EXISTS idx_notes_status ON notes(status)",
-            "CREATE INDEX IF NOT EXISTS idx_notes_primary_category ON notes(primary_category)",
-            "CREATE INDEX IF NOT EXISTS idx_notes_created_datetime ON notes(created_datetime)",
-            "CREATE INDEX IF NOT EXISTS idx_notes_modified_datetime ON notes(modified_datetime)",
-            "CREATE INDEX IF NOT EXISTS idx_notes_title ON notes(title)",
-            "CREATE INDEX IF NOT EXISTS idx_links_note_id ON extracted_links(note_id)",
-            "CREATE INDEX IF NOT EXISTS idx_links_type ON extracted_links(link_type)",
-            "CREATE INDEX IF NOT EXISTS idx_images_note_id ON extracted_images(note_id)",
-            "CREATE INDEX IF NOT EXISTS idx_analysis_note_id ON analysis(note_id)",
-            "CREATE INDEX IF NOT EXISTS idx_tasks_note_id ON extracted_tasks(note_id)",
-            "CREATE INDEX IF NOT EXISTS idx_ideas_note_id ON extracted_ideas(note_id)",
-            "CREATE INDEX IF NOT EXISTS idx_projects_note_id ON extracted_projects(note_id)",
-            "CREATE INDEX IF NOT EXISTS idx_categories_note_id ON note_categories(note_id)",
-        ]
-
-        for index_sql in indexes:
-            self.cursor.execute(index_sql)
-
-        self.conn.commit()
+        self.conn.executescript(INDEX_SQL)
         print("✓ Indexes created")
 
     def import_note(self, note_data: Dict):
-        """Import a single note with all its related data"""
-        try:
-            note_id = note_data.get('note_id')
-            if not note_id:
-                self.stats['errors'].append("Missing note_id in note data")
-                return
-
-            # Parse dates
-            created_datetime = parse_macos_date(note_data.get('created', ''))
-            modified_datetime = parse_macos_date(note_data.get('modified', ''))
+        """Queue a single note with all its related data for the next flush"""
+        errors = []
+        self.queue_rows(build_note_rows(note_from_dict(note_data), errors))
+        self.record_errors(errors)
+
+    def record_errors(self, messages: List[str]):
+        """Keep error messages up to MAX_ERRORS and count the rest"""
+        errors = self.stats['errors']
+        kept = min(max(MAX_ERRORS - len(errors), 0), len(messages))
+        errors.extend(messages[:kept])
+        self.stats['errors_dropped'] += len(messages) - kept
+
+    def queue_rows(self, rows: Optional[Dict[str, List[Tuple]]]):
+        """Queue prebuilt note rows, flushing once a full batch is pending"""
+        if rows:
+            self.pending.append(rows)
+            if len(self.pending) >= BATCH_SIZE:
+                self.flush()
+
+    def flush(self):
+        """Insert all queued notes in one transaction"""
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
 
-            # Convert HTML to plain text
-            content = note_data.get('content', '')
-            plain_text = html_to_text(content)
-
-            # Insert core note
-            self.cursor.execute('''
-                INSERT INTO notes (
-                    note_id, original_index, title, content, content_cleaned,
-                    plain_text, folder, account, coredata_id,
-                    created_raw, created_datetime, modified_raw, modified_datetime,
-                    status, processed, primary_category, content_length
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                note_id,
-                note_data.get('original_index', 0),
-                note_data.get('title', 'Untitled'),
-                content,
-                note_data.get('content_cleaned', content),
-                plain_text,
-                note_data.get('folder', 'Notes'),
-                note_data.get('account', 'Unknown'),
-                note_data.get('id', ''),
-                note_data.get('created', ''),
-                created_datetime,
-                note_data.get('modified', ''),
-                modified_datetime,
-                note_data.get('status', 'pending'),
-                1 if note_data.get('processed', False) else 0,
-                note_data.get('primary_category', None),
-                len(plain_text)
-            ))
-
-            self.stats['notes_imported'] += 1
-
-            # Import extracted links
-            extracted_data = note_data.get('extracted_data', {})
-            links = extracted_data.get('links', [])
-
-            # Also check analysis for categorized links
-            analysis = note_data.get('analysis', {})
-            links_categorized = analysis.get('links_categorized', {})
-
-            for link in links:
+        try:
+            with self.conn:
+                self.insert_rows(batch)
+        except Exception:
+            # One bad note fails the whole batch; retry note by note so that
+            # only the offending notes are skipped. Values sqlite3 cannot bind
+            # raise OverflowError rather than sqlite3.Error, so catch both.
+            for rows in batch:
                 try:
-                    self.cursor.execute('''
-                        INSERT OR IGNORE INTO extracted_links (note_id, url, link_type)
-                        VALUES (?, ?, ?)
-                    ''', (note_id, link, None))
-                    self.stats['links_imported'] += 1
+                    with self.conn:
+                        self.insert_rows([rows])
                 except Exception as e:
-                    self.stats['errors'].append(f"Link import error for {note_id}: {e}")
-
-            # Import categorized links
-            for link_type, link_list in links_categorized.items():
-                for link in link_list:
-                    try:
-                        self.cursor.execute('''
-                            INSERT OR IGNORE INTO extracted_links (note_id, url, link_type)
-                            VALUES (?, ?, ?)
-                        ''', (note_id, link, link_type))
-                        self.stats['links_imported'] += 1
-                    except Exception as e:
-                        pass  # Might be duplicate
-
-            # Import extracted images
-            images = extracted_data.get('images', [])
-            for idx, image in enumerate(images, 1):
-                if isinstance(image, dict):
-                    filename = image.get('filename', '')
-                    relative_path = image.get('path', f"images/{filename}")
-                    image_format = image.get('format', '')
-                    size_bytes = image.get('size', 0)
+                    self.record_errors([f"Failed to import note {rows['notes'][0][0]}: {e}"])
                 else:
-                    # Simple string filename
-                    filename = image
-                    relative_path = f"images/{filename}"
-                    image_format = ''
-                    size_bytes = 0
+                    self.count_rows([rows])
+        else:
+            self.count_rows(batch)
 
-                try:
-                    self.cursor.execute('''
-                        INSERT OR IGNORE INTO extracted_images (
-                            note_id, filename, relative_path, image_format,
-                            size_bytes, extraction_order
-                        ) VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (note_id, filename, relative_path, image_format, size_bytes, idx))
-                    self.stats['images_imported'] += 1
-                except Exception as e:
-                    self.stats['errors'].append(f"Image import error for {note_id}: {e}")
+    def insert_rows(self, batch: List[Dict[str, List[Tuple]]]):
+        """Insert a batch of notes' rows with one executemany per table"""
+        def table_rows(table):
+            return [row for rows in batch for row in rows[table]]
 
-            # Import categories
-            categories = note_data.get('categories', [])
-            for category in categories:
-                try:
-                    self.cursor.execute('''
-                        INSERT OR IGNORE INTO note_categories (note_id, category)
-                        VALUES (?, ?)
-                    ''', (note_id, category))
-                    self.stats['categories_imported'] += 1
-                except Exception as e:
-                    pass  # Likely duplicate
-
-            # Import analysis data if present
-            if analysis:
-                summary = analysis.get('summary', '')
-                plain_text_sample = analysis.get('plain_text', '')[:1000]
-
-                if summary or plain_text_sample:
-                    try:
-                        self.cursor.execute('''
-                            INSERT OR IGNORE INTO analysis (
-                                note_id, summary, plain_text_sample
-                            ) VALUES (?, ?, ?)
-                        ''', (note_id, summary, plain_text_sample))
-                    except Exception as e:
-                        self.stats['errors'].append(f"Analysis import error for {note_id}: {e}")
-
-                # Import tasks
-                tasks = analysis.get('tasks', [])
-                for task in tasks:
-                    try:
-                        task_text = task if isinstance(task, str) else task.get('text', '')
-                        self.cursor.execute('''
-                            INSERT INTO extracted_tasks (note_id, task_text)
-                            VALUES (?, ?)
-                        ''', (note_id, task_text))
-                        self.stats['tasks_imported'] += 1
-                    except Exception as e:
-                        self.stats['errors'].append(f"Task import error for {note_id}: {e}")
-
-                # Import ideas
-                ideas = analysis.get('ideas', [])
-                for idea in ideas:
-                    try:
-                        idea_text = idea if isinstance(idea, str) else idea.get('text', '')
-                        self.cursor.execute('''
-                            INSERT INTO extracted_ideas (note_id, idea_text)
-                            VALUES (?, ?)
-                        ''', (note_id, idea_text))
-                        self.stats['ideas_imported'] += 1
-                    except Exception as e:
-                        self.stats['errors'].append(f"Idea import error for {note_id}: {e}")
-
-                # Import projects
-                projects = analysis.get('projects', [])
-                for project in projects:
-                    try:
-                        project_name = project if isinstance(project, str) else project.get('name', '')
-                        self.cursor.execute('''
-                            INSERT INTO extracted_projects (note_id, project_name)
-                            VALUES (?, ?)
-                        ''', (note_id, project_name))
-                        self.stats['projects_imported'] += 1
-                    except Exception as e:
-                        self.stats['errors'].append(f"Project import error for {note_id}: {e}")
-
-        except Exception as e:
-            self.stats['errors'].append(f"Failed to import note {note_data.get('note_id', 'unknown')}: {e}")
+        for table, sql in INSERT_SQL.items():
+            self.cursor.executemany(sql, table_rows(table))
+
+    def count_rows(self, batch: List[Dict[str, List[Tuple]]]):
+        """Add inserted row counts to the import statistics"""
+        for rows in batch:
+            for table, stat in ROW_STATS.items():
+                if stat:
+                    self.stats[stat] += len(rows[table])
 
     def populate_lookup_tables(self):
         """Populate accounts and folders lookup tables"""
         print("Populating lookup tables...")
 
-        # Populate accounts
-        self.cursor.execute('''
-            INSERT OR IGNORE INTO accounts (account_name, note_count)
-            SELECT account, COUNT(*) FROM notes GROUP BY account
-        ''')
+        with self.conn:
+            # Populate accounts
+            self.cursor.execute('''
+                INSERT OR IGNORE INTO accounts (account_name, note_count)
+                SELECT account, COUNT(*) FROM notes GROUP BY account
+            ''')
 
-        # Populate folders
-        self.cursor.execute('''
-            INSERT OR IGNORE INTO folders (folder_name, account_name, note_count)
-            SELECT folder, account, COUNT(*) FROM notes GROUP BY folder, account
-        ''')
+            # Populate folders
+            self.cursor.execute('''
+                INSERT OR IGNORE INTO folders (folder_name, account_name, note_count)
+                SELECT folder, account, COUNT(*) FROM notes GROUP BY folder, account
+            ''')
 
-        self.conn.commit()
+        # Gather planner statistics for the queries in generate_statistics()
+        self.conn.execute("ANALYZE")
         print("✓ Lookup tables populated")
 
     def generate_statistics(self) -> Dict:
@@ -617,8 +945,16 @@ def main():
         print("Please ensure you have exported individual notes first.")
         sys.exit(1)
 
-    # Count JSON files
-    json_files = list(individual_notes_dir.glob("note_*.json"))
+    # Count JSON files, largest first so the slowest reads start early and
+    # the writer keeps getting full batches while small files finish
+    with os.scandir(individual_notes_dir) as entries:
+        sized_files = [
+            (-entry.stat().st_size, entry.path)
+            for entry in entries
+            if entry.name.startswith("note_") and entry.name.endswith(".json") and entry.is_file()
+        ]
+    sized_files.sort()
+    json_files = [path for _, path in sized_files]
     total_files = len(json_files)
 
     if total_files == 0:
@@ -637,18 +973,18 @@ def main():
     print(f"Importing notes from {individual_notes_dir}...")
     print()
 
-    for idx, json_file in enumerate(json_files, 1):
+    # Worker threads read, parse and convert the files; this thread is the
+    # only one touching the connection. Results come back in file order, so
+    # which copy of a duplicate note_id wins does not depend on thread timing.
+    for idx, (rows, errors) in enumerate(iter_note_rows(json_files), 1):
         if idx % 100 == 0:
             print(f"  Progress: {idx}/{total_files} notes imported...")
-            db.conn.commit()  # Periodic commits
 
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                note_data = json.load(f)
-                db.import_note(note_data)
-        except Exception as e:
-            db.stats['errors'].append(f"Failed to read {json_file}: {e}")
+        if errors:
+            db.record_errors(errors)
+        db.queue_rows(rows)
 
+    db.flush()
     print(f"  Progress: {total_files}/{total_files} notes imported...")
     print()
 
@@ -663,8 +999,8 @@ def main():
     stats['import_stats'] = db.stats
 
     # Save statistics to file
-    with open(stats_output, 'w', encoding='utf-8') as f:
-        json.dump(stats, f, indent=2, default=str)
+    with open(stats_output, 'wb') as f:
+        f.write(_json_fast.dumps(stats, indent=True, default=str))
 
     print()
     print("=" * 60)
@@ -680,7 +1016,7 @@ def main():
     print()
 
     if db.stats['errors']:
-        print(f"Errors encountered:  {len(db.stats['errors'])}")
+        print(f"Errors encountered:  {len(db.stats['errors']) + db.stats['errors_dropped']}")
         print("(See database_stats.json for details)")
         print()
 
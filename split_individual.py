@@ -2,21 +2,64 @@
 """
 Split notes into individual JSON files, one per note.
 Extract embedded images and attachments.
+
+Per-note files are written as compact JSON: they are read by the analysis
+and export scripts rather than by hand, and indentation roughly doubles
+their size and encoding time. master_index.json stays indented for people
+browsing the output, with one line per note; it is built from
+master_index.jsonl, which holds the same entries as JSON Lines.
+
+content_cleaned (the HTML with embedded images swapped for references to
+images/) is only written for notes that had images; readers should fall
+back to content when it is absent.
 """
 
-import json
 import os
 import re
-import base64
+import itertools
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import _json_fast
+
+try:
+    from pybase64 import b64decode
+except ImportError:  # Fall back to the standard library decoder
+    from base64 import b64decode
+
+# Filename sanitizing: invalid characters become '_', control characters are dropped
+_SANITIZE_TABLE = str.maketrans({
+    **{char: '_' for char in '<>:"/\\|?*'},
+    **{chr(code): None for code in (*range(0x00, 0x20), *range(0x7f, 0xa0))},
+})
+_IMG_RE = re.compile(r'<img[^>]*src="data:image/([^;]+);base64,([^"]+)"[^>]*>')
+_LINK_RE = re.compile(r'href="([^"]+)"|(https?://[^\s<>"\']+)')
+_URL_RE = re.compile(r'https?://[^\s<>"\']+')
+
+# Notes handed to the worker processes ahead of the one being recorded
+MAX_PENDING = 256
+
+# Index entries are appended here one line per note as they are produced,
+# then streamed into master_index.json
+INDEX_LINES_FILE = 'master_index.jsonl'
+
+
+def write_file(path, data):
+    """Write bytes to path with raw os calls, bypassing Python's io layer."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 
 def sanitize_filename(text, max_length=100):
     """Create a safe filename from text."""
-    # Remove or replace invalid characters
-    text = re.sub(r'[<>:"/\\|?*]', '_', text)
-    # Remove control characters
-    text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
+    # Replace invalid characters and remove control characters
+    text = text.translate(_SANITIZE_TABLE)
     # Limit length
     text = text[:max_length].strip()
     # Remove leading/trailing dots and spaces
@@ -25,72 +68,158 @@ def sanitize_filename(text, max_length=100):
     return text if text else 'untitled'
 
 
-def extract_images(html_content, note_id, output_dir):
+def extract_images(html_content, note_id, image_dir):
     """
-    Extract base64 encoded images from HTML content.
+    Extract base64 encoded images from HTML content into image_dir, which
+    must already exist.
     Returns list of extracted image info and updated HTML.
     """
+    # Every embedded image contains this literal; skip the regex without it
+    if 'data:image/' not in html_content:
+        return [], html_content
+
     images = []
-    image_dir = output_dir / 'images'
-    image_dir.mkdir(exist_ok=True)
 
-    # Find all base64 encoded images
-    pattern = r'<img[^>]*src="data:image\/([^;]+);base64,([^"]+)"[^>]*>'
-    matches = re.finditer(pattern, html_content)
+    # Image numbers count every embedded image, including ones that fail
+    image_numbers = itertools.count(1)
 
-    for idx, match in enumerate(matches, 1):
+    def replace_image(match):
+        idx = next(image_numbers)
         image_format = match.group(1)
         image_data = match.group(2)
 
         try:
             # Decode base64
-            img_bytes = base64.b64decode(image_data)
+            img_bytes = b64decode(image_data)
 
             # Create filename
             img_filename = f"{note_id}_img_{idx}.{image_format}"
             img_path = image_dir / img_filename
 
             # Save image
-            with open(img_path, 'wb') as f:
-                f.write(img_bytes)
-
-            images.append({
-                'filename': img_filename,
-                'format': image_format,
-                'size_bytes': len(img_bytes),
-                'relative_path': f'images/{img_filename}'
-            })
-
-            # Replace in HTML with reference
-            html_content = html_content.replace(
-                match.group(0),
-                f'<img src="images/{img_filename}" data-original-format="{image_format}">'
-            )
+            write_file(img_path, img_bytes)
         except Exception as e:
             print(f"Warning: Could not extract image {idx} from note {note_id}: {e}")
+            return match.group(0)
+
+        images.append({
+            'filename': img_filename,
+            'format': image_format,
+            'size_bytes': len(img_bytes),
+            'relative_path': f'images/{img_filename}'
+        })
+
+        # Replace in HTML with reference
+        return f'<img src="images/{img_filename}" data-original-format="{image_format}">'
+
+    # Rewrite all base64 encoded images in one pass
+    html_content = _IMG_RE.sub(replace_image, html_content)
 
     return images, html_content
 
 
 def extract_links(html_content):
-    """Extract all URLs from HTML content."""
-    links = []
+    """Extract all URLs from HTML content, in order of first appearance."""
+    # Every link kept starts with http
+    if 'http' not in html_content:
+        return []
 
-    # Find href links
-    href_pattern = r'href="([^"]+)"'
-    hrefs = re.findall(href_pattern, html_content)
-    links.extend(hrefs)
+    links = {}
 
-    # Find plain text URLs
-    url_pattern = r'https?://[^\s<>"\']+'
-    text_urls = re.findall(url_pattern, html_content)
-    links.extend(text_urls)
+    # One scan finds both href links and plain text URLs
+    for match in _LINK_RE.finditer(html_content):
+        href, url = match.groups()
+        if href is None:
+            links[url] = None
+            continue
 
-    # Remove duplicates and filter
-    links = list(set(links))
-    links = [l for l in links if l.startswith('http')]
+        if href.startswith('http'):
+            links[href] = None
+        # URLs inside the attribute value also count as plain text URLs
+        for url in _URL_RE.findall(href):
+            links[url] = None
 
-    return links
+    return list(links)
+
+
+def _process_one(task):
+    """
+    Extract one note's images and links and write its JSON file.
+    Runs in a worker process; returns (image count, link count, index entry).
+    """
+    idx, note, output_path = task
+    image_dir = output_path / 'images'
+
+    # Create note ID from index
+    note_id = f"note_{idx:04d}"
+
+    content = note['content']
+
+    # Extract images
+    images, updated_html = extract_images(content, note_id, image_dir)
+
+    # Extract links from the rewritten HTML, which no longer carries the
+    # base64 image payloads
+    links = extract_links(updated_html)
+
+    # Create enhanced note object
+    note_data = {
+        'note_id': note_id,
+        'original_index': idx - 1,
+        'title': note['title'],
+        'content': content,
+        'text_preview': note.get('text_preview', ''),
+        'folder': note['folder'],
+        'account': note['account'],
+        'id': note['id'],
+        'created': note['created'],
+        'modified': note['modified'],
+        'status': note.get('status', 'pending'),
+        'processed': note.get('processed', False),
+        'categories': note.get('categories', []),
+        'extracted_data': {
+            'images': images,
+            'links': links,
+            'image_count': len(images),
+            'link_count': len(links)
+        }
+    }
+    if images:
+        note_data['content_cleaned'] = updated_html
+
+    # Create filename from title
+    safe_title = sanitize_filename(note['title'])
+    filename = f"{note_id}_{safe_title}.json"
+    file_path = output_path / filename
+
+    # Write individual note file
+    write_file(file_path, _json_fast.dumps(note_data))
+
+    return len(images), len(links), {
+        'note_id': note_id,
+        'filename': filename,
+        'title': note['title'],
+        'has_images': len(images) > 0,
+        'has_links': len(links) > 0
+    }
+
+
+def _process_all(notes, output_path):
+    """
+    Run _process_one over the notes in worker processes and yield the
+    results in note order. Notes are independent, so image decoding, link
+    scanning and file writes run in parallel; at most MAX_PENDING notes are
+    in flight, so the input stream is never read far ahead of the workers.
+    """
+    pending = deque()
+    with ProcessPoolExecutor() as executor:
+        for idx, note in enumerate(notes, 1):
+            pending.append(executor.submit(_process_one, (idx, note, output_path)))
+            if len(pending) >= MAX_PENDING:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
 
 
 def create_individual_notes(input_file, output_dir):
@@ -106,103 +235,67 @@ def create_individual_notes(input_file, output_dir):
     """
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
+    (output_path / 'images').mkdir(exist_ok=True)
 
-    # Load all notes
+    # Stream the notes; the total is only known once they have all been read
     print(f"Loading {input_file}...")
-    with open(input_file, 'r') as f:
-        notes = json.load(f)
-
-    total_notes = len(notes)
-    print(f"Total notes: {total_notes}")
+    notes = _json_fast.iter_items(input_file)
     print(f"Creating individual files in {output_dir}/...")
 
-    stats = {
-        'total_notes': total_notes,
-        'notes_with_images': 0,
-        'total_images': 0,
-        'notes_with_links': 0,
-        'total_links': 0,
-        'files_created': []
-    }
+    total_notes = notes_with_images = total_images = notes_with_links = total_links = 0
+    with open(output_path / INDEX_LINES_FILE, 'wb') as index_lines:
+        for image_count, link_count, file_entry in _process_all(notes, output_path):
+            if image_count:
+                notes_with_images += 1
+                total_images += image_count
+            if link_count:
+                notes_with_links += 1
+                total_links += link_count
 
-    for idx, note in enumerate(notes, 1):
-        # Create note ID from index
-        note_id = f"note_{idx:04d}"
-
-        # Extract images
-        images, updated_html = extract_images(note['content'], note_id, output_path)
-        if images:
-            stats['notes_with_images'] += 1
-            stats['total_images'] += len(images)
-
-        # Extract links
-        links = extract_links(note['content'])
-        if links:
-            stats['notes_with_links'] += 1
-            stats['total_links'] += len(links)
-
-        # Create enhanced note object
-        note_data = {
-            'note_id': note_id,
-            'original_index': idx - 1,
-            'title': note['title'],
-            'content': note['content'],
-            'content_cleaned': updated_html if images else note['content'],
-            'text_preview': note.get('text_preview', ''),
-            'folder': note['folder'],
-            'account': note['account'],
-            'id': note['id'],
-            'created': note['created'],
-            'modified': note['modified'],
-            'status': note.get('status', 'pending'),
-            'processed': note.get('processed', False),
-            'categories': note.get('categories', []),
-            'extracted_data': {
-                'images': images,
-                'links': links,
-                'image_count': len(images),
-                'link_count': len(links)
-            }
-        }
+            index_lines.write(_json_fast.dumps(file_entry) + b'\n')
+            total_notes += 1
 
-        # Create filename from title
-        safe_title = sanitize_filename(note['title'])
-        filename = f"{note_id}_{safe_title}.json"
-        file_path = output_path / filename
-
-        # Write individual note file
-        with open(file_path, 'w') as f:
-            json.dump(note_data, f, indent=2)
-
-        stats['files_created'].append({
-            'note_id': note_id,
-            'filename': filename,
-            'title': note['title'],
-            'has_images': len(images) > 0,
-            'has_links': len(links) > 0
-        })
+            # Progress indicator
+            if total_notes % 100 == 0:
+                print(f"  Processed {total_notes} notes...")
 
-        # Progress indicator
-        if idx % 100 == 0:
-            print(f"  Processed {idx}/{total_notes} notes...")
+    stats = {
+        'total_notes': total_notes,
+        'notes_with_images': notes_with_images,
+        'total_images': total_images,
+        'notes_with_links': notes_with_links,
+        'total_links': total_links
+    }
 
+    print(f"Total notes: {stats['total_notes']}")
     return stats
 
 
 def create_master_index(stats, output_dir):
-    """Create a master index of all individual notes."""
+    """
+    Create a master index of all individual notes. The per-note entries are
+    copied line by line from the JSON Lines sidecar, so they are never all
+    held in memory.
+    """
     index_data = {
         'total_notes': stats['total_notes'],
         'notes_with_images': stats['notes_with_images'],
         'total_images_extracted': stats['total_images'],
         'notes_with_links': stats['notes_with_links'],
         'total_links_found': stats['total_links'],
-        'notes': stats['files_created']
     }
 
+    # Reopen the summary object to append the "notes" array, one compact
+    # entry per line
+    header = _json_fast.dumps(index_data, indent=True)[:-1].rstrip()
     index_path = Path(output_dir) / 'master_index.json'
-    with open(index_path, 'w') as f:
-        json.dump(index_data, f, indent=2)
+    with open(index_path, 'wb') as f, open(Path(output_dir) / INDEX_LINES_FILE, 'rb') as lines:
+        f.write(header + b',\n  "notes": [')
+        first = True
+        for line in lines:
+            f.write((b'\n    ' if first else b',\n    ') + line.rstrip(b'\n'))
+            first = False
+        f.write(b']\n}' if first else b'\n  ]\n}')
 
     print(f"\nCreated master index: {index_path}")
     return index_path
@@ -236,6 +329,7 @@ def main():
     if stats['total_images'] > 0:
         print(f"  - images/ folder with {stats['total_images']} extracted images")
     print(f"  - master_index.json (index of all notes)")
+    print(f"  - {INDEX_LINES_FILE} (the same index, one JSON object per line)")
     print("\nEach note file contains:")
     print("  - Original metadata and content")
     print("  - Extracted images and links")
@@ -4,23 +4,42 @@ Split large notes.json into manageable chunks for AI processing.
 Each chunk contains a subset of notes with metadata for tracking.
 """
 
-import json
 import os
 import re
+from html import unescape
 from pathlib import Path
 from datetime import datetime
 
+import _json_fast
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+
 
 def clean_html(html_content):
     """Extract plain text from HTML content."""
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', html_content)
-    # Decode common HTML entities
-    text = text.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
-    text = text.replace('&quot;', '"').replace('&#39;', "'")
-    # Clean up whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    # Remove HTML tags, decode entities and clean up whitespace
+    return _WS_RE.sub(' ', unescape(_TAG_RE.sub('', html_content))).strip()
+
+
+def write_chunk(chunk_notes, chunk_num, start_index, output_path):
+    """Write one chunk file and return its metadata."""
+    chunk_filename = f"chunk_{chunk_num:03d}.json"
+    chunk_path = output_path / chunk_filename
+
+    chunk_path.write_bytes(_json_fast.dumps(chunk_notes, indent=True))
+
+    print(f"  Created {chunk_filename}: {len(chunk_notes)} notes")
+
+    # Track metadata
+    return {
+        'chunk_id': chunk_num,
+        'filename': chunk_filename,
+        'note_count': len(chunk_notes),
+        'start_index': start_index,
+        'end_index': start_index + len(chunk_notes) - 1,
+        'created_at': datetime.now().isoformat()
+    }
 
 
 def create_chunks(input_file, output_dir, chunk_size=100):
@@ -39,49 +58,31 @@ def create_chunks(input_file, output_dir, chunk_size=100):
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
 
-    # Load all notes
+    # Stream the notes, writing each chunk as soon as it is full
     print(f"Loading {input_file}...")
-    with open(input_file, 'r') as f:
-        notes = json.load(f)
-
-    total_notes = len(notes)
-    print(f"Total notes: {total_notes}")
     print(f"Creating chunks of {chunk_size} notes each...")
 
     chunks_metadata = []
+    chunk_notes = []
+    total_notes = 0
 
-    # Split into chunks
-    for i in range(0, total_notes, chunk_size):
-        chunk_num = i // chunk_size + 1
-        chunk_notes = notes[i:i + chunk_size]
-
+    for note in _json_fast.iter_items(input_file):
         # Add plain text preview to each note
-        for note in chunk_notes:
-            note['text_preview'] = clean_html(note['content'])[:500]
-            note['processed'] = False
-            note['status'] = 'pending'  # pending, analyzed, keep, delete, needs-review
-            note['categories'] = []  # Will store: tasks, ideas, projects, links, notes
-
-        # Create chunk file
-        chunk_filename = f"chunk_{chunk_num:03d}.json"
-        chunk_path = output_path / chunk_filename
-
-        with open(chunk_path, 'w') as f:
-            json.dump(chunk_notes, f, indent=2)
-
-        # Track metadata
-        chunk_meta = {
-            'chunk_id': chunk_num,
-            'filename': chunk_filename,
-            'note_count': len(chunk_notes),
-            'start_index': i,
-            'end_index': i + len(chunk_notes) - 1,
-            'created_at': datetime.now().isoformat()
-        }
-        chunks_metadata.append(chunk_meta)
-
-        print(f"  Created {chunk_filename}: {len(chunk_notes)} notes")
+        note['text_preview'] = clean_html(note['content'])[:500]
+        note['processed'] = False
+        note['status'] = 'pending'  # pending, analyzed, keep, delete, needs-review
+        note['categories'] = []  # Will store: tasks, ideas, projects, links, notes
 
+        chunk_notes.append(note)
+        total_notes += 1
+        if len(chunk_notes) == chunk_size:
+            chunks_metadata.append(write_chunk(chunk_notes, len(chunks_metadata) + 1, total_notes - len(chunk_notes), output_path))
+            chunk_notes = []
+
+    if chunk_notes:
+        chunks_metadata.append(write_chunk(chunk_notes, len(chunks_metadata) + 1, total_notes - len(chunk_notes), output_path))
+
+    print(f"Total notes: {total_notes}")
     return chunks_metadata
 
 
@@ -95,8 +96,7 @@ def create_index(chunks_metadata, output_dir):
     }
 
     index_path = Path(output_dir) / 'index.json'
-    with open(index_path, 'w') as f:
-        json.dump(index_data, f, indent=2)
+    index_path.write_bytes(_json_fast.dumps(index_data, indent=True))
 
     print(f"\nCreated index file: {index_path}")
     return index_data